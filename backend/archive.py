@@ -0,0 +1,123 @@
+"""Cold storage for old submissions.
+
+Rows moved out of the hot workbooks are written to immutable gzip segment
+files under ``data/archive/<kind>/``. A segment is a run of independent gzip
+members ("blocks") of up to BLOCK_ROWS rows each, sorted by timestamp.
+``index.json`` records each segment's time range and the first timestamp,
+byte offset and length of every block. Time-range queries and ID lookups
+therefore decompress only the blocks they need, not the whole archive.
+"""
+import gzip
+import json
+import os
+import threading
+
+BLOCK_ROWS = 256
+# A row's Timestamp is taken just after its ID is generated, so ID lookups
+# search a small window around the time decoded from the ID.
+LOOKUP_SLACK_SECONDS = 5
+
+
+class SubmissionArchive:
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_file = directory / 'index.json'
+        self._lock = threading.Lock()
+        self._index = {'headers': None, 'segments': []}
+        if self.index_file.exists():
+            with open(self.index_file, 'r') as f:
+                self._index = json.load(f)
+
+    @property
+    def headers(self):
+        return self._index['headers']
+
+    @property
+    def max_timestamp(self):
+        """Newest archived timestamp, or None while the archive is empty."""
+        segments = self._index['segments']
+        return max(segment['max_ts'] for segment in segments) if segments else None
+
+    def row_count(self):
+        return sum(segment['rows'] for segment in self._index['segments'])
+
+    def write_segment(self, headers, rows):
+        """Write ``(timestamp, row)`` pairs to a new segment and add it to the index."""
+        rows = sorted(rows, key=lambda pair: pair[0])
+        if not rows:
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Skip numbers left behind by a write that never reached the index
+            number = len(self._index['segments']) + 1
+            while (self.directory / f"segment-{number:05d}.jsonl.gz").exists():
+                number += 1
+            name = f"segment-{number:05d}.jsonl.gz"
+            blocks = []
+            # 'xb' so an existing segment can never be overwritten
+            with open(self.directory / name, 'xb') as f:
+                for start in range(0, len(rows), BLOCK_ROWS):
+                    chunk = rows[start:start + BLOCK_ROWS]
+                    data = ''.join(json.dumps([ts, list(row)], default=str) + '\n' for ts, row in chunk)
+                    compressed = gzip.compress(data.encode(), mtime=0)
+                    blocks.append([chunk[0][0], f.tell(), len(compressed)])
+                    f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            self._index['headers'] = list(headers)
+            self._index['segments'].append({
+                'file': name,
+                'rows': len(rows),
+                'min_ts': rows[0][0],
+                'max_ts': rows[-1][0],
+                'blocks': blocks,
+            })
+            self._save_index()
+
+    def _save_index(self):
+        tmp_path = self.index_file.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_file)
+
+    def _read_block(self, segment, block):
+        with open(self.directory / segment['file'], 'rb') as f:
+            f.seek(block[1])
+            data = gzip.decompress(f.read(block[2]))
+        for line in data.decode().splitlines():
+            yield json.loads(line)
+
+    def _blocks(self, since=None, until=None):
+        """Yield (segment, block) pairs that may hold rows in [since, until]."""
+        for segment in self._index['segments']:
+            if (since is not None and segment['max_ts'] < since) or (until is not None and segment['min_ts'] > until):
+                continue
+            blocks = segment['blocks']
+            for i, block in enumerate(blocks):
+                block_end = blocks[i + 1][0] if i + 1 < len(blocks) else segment['max_ts']
+                if (since is not None and block_end < since) or (until is not None and block[0] > until):
+                    continue
+                yield segment, block
+
+    def iter_rows(self, since=None, until=None):
+        """Yield archived rows with timestamps in [since, until], oldest first."""
+        for segment, block in self._blocks(since, until):
+            for ts, row in self._read_block(segment, block):
+                if (since is None or ts >= since) and (until is None or ts <= until):
+                    yield row
+
+    def find(self, row_id, timestamp=None):
+        """Return the archived row with this ID, or None.
+
+        With the row's timestamp known (decoded from a time-sortable ID) only
+        the blocks around that instant are read; otherwise every block is.
+        """
+        if timestamp is None:
+            blocks = self._blocks()
+        else:
+            blocks = self._blocks(timestamp - LOOKUP_SLACK_SECONDS, timestamp + LOOKUP_SLACK_SECONDS)
+        for segment, block in blocks:
+            for _, row in self._read_block(segment, block):
+                if row and row[0] == row_id:
+                    return row
+        return None
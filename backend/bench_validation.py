@@ -0,0 +1,72 @@
+"""Microbenchmarks for validation.py.
+
+Run from the backend directory: python bench_validation.py
+
+The submission benchmarks cover the per-request work of register_student:
+parsing the JSON payload into StudentRegistration, the field checks, and
+generating the row ID and timestamp. The legacy version is what the handler
+did before validation.py (inline phone regex, uuid4()[:8]).
+"""
+import re
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from server import StudentRegistration
+from validation import new_id, normalize_age, normalize_email, normalize_phone
+
+N = 100_000
+ID_COUNT = 1_000_000
+
+PAYLOAD = {
+    'name': 'Test Student',
+    'age': '13',
+    'school': 'Test School',
+    'email': 'Parent.Name@Example.com',
+    'phone': '(555) 123-4567',
+    'consent': True,
+}
+
+
+def student_submission():
+    student = StudentRegistration.model_validate(PAYLOAD)
+    if not student.consent:
+        raise ValueError('Consent is required')
+    age = normalize_age(student.age)
+    email = normalize_email(student.email)
+    phone_digits = normalize_phone(student.phone)
+    return [new_id(), student.name, age, student.school, email, phone_digits,
+            datetime.now(timezone.utc).isoformat()]
+
+
+def legacy_student_submission():
+    student = StudentRegistration.model_validate(PAYLOAD)
+    if not student.consent:
+        raise ValueError('Consent is required')
+    phone_digits = re.sub(r'\D', '', student.phone or '')
+    if len(phone_digits) > 10:
+        raise ValueError('Phone number must be at most 10 digits')
+    return [str(uuid.uuid4())[:8], student.name, student.age, student.school, student.email, phone_digits,
+            datetime.now(timezone.utc).isoformat()]
+
+
+def per_call_us(func):
+    return min(timeit.repeat(func, number=N, repeat=5)) / N * 1e6
+
+
+def main():
+    print(f"model_validate:     {per_call_us(lambda: StudentRegistration.model_validate(PAYLOAD)):.2f} us")
+    print(f"normalize_phone:    {per_call_us(lambda: normalize_phone('(555) 123-4567')):.2f} us")
+    print(f"normalize_email:    {per_call_us(lambda: normalize_email('Parent.Name@Example.com')):.2f} us")
+    print(f"normalize_age:      {per_call_us(lambda: normalize_age('13')):.2f} us")
+    print(f"new_id:             {per_call_us(new_id):.2f} us (uuid4()[:8]: {per_call_us(lambda: str(uuid.uuid4())[:8]):.2f} us)")
+    print(f"student submission: {per_call_us(student_submission):.2f} us (legacy: {per_call_us(legacy_student_submission):.2f} us)")
+
+    ids = [new_id() for _ in range(ID_COUNT)]
+    print(f"{ID_COUNT:,} IDs: {len(set(ids)):,} unique, sorted={ids == sorted(ids)}")
+    legacy = [str(uuid.uuid4())[:8] for _ in range(ID_COUNT)]
+    print(f"{ID_COUNT:,} legacy uuid[:8] IDs: {ID_COUNT - len(set(legacy)):,} collisions")
+
+
+if __name__ == '__main__':
+    main()
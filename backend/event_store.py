@@ -0,0 +1,233 @@
+"""Multi-event storage for the competition portal.
+
+Events live in ``data/events.json``. The whole file is loaded once and kept
+in memory together with a small index (events sorted by date and bucketed by
+status), so request handlers never open a file just to find the active event.
+Every mutation rewrites the JSON file atomically; only changes to the events
+themselves (not registration counts) rebuild the index.
+"""
+import json
+import os
+import threading
+from datetime import date, datetime
+
+from validation import new_id
+
+# Formats accepted for the free-text ``date`` field, tried in order.
+DATE_FORMATS = ('%Y-%m-%d', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%m/%d/%Y')
+STATUSES = ('upcoming', 'past', 'cancelled', 'unscheduled')
+REGISTRATION_KINDS = ('students', 'volunteers')
+EDITABLE_FIELDS = ('title', 'description', 'date', 'location', 'student_cap', 'volunteer_cap', 'cancelled')
+
+
+class EventNotFound(KeyError):
+    pass
+
+
+class EventFull(Exception):
+    pass
+
+
+class EventClosed(Exception):
+    pass
+
+
+def parse_event_date(value):
+    """Return a ``date`` for the given event date string, or None if unparseable."""
+    if not value:
+        return None
+    value = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class EventStore:
+    def __init__(self, filepath, today=date.today, load=True):
+        self.filepath = filepath
+        self._today = today
+        self._lock = threading.RLock()
+        self._events = {}
+        self._index = None
+        self.load_error = None
+        if load:
+            self.load()
+
+    # -- persistence -----------------------------------------------------
+
+    def load(self):
+        with self._lock:
+            try:
+                events = []
+                if self.filepath.exists():
+                    with open(self.filepath, 'r') as f:
+                        events = json.load(f).get('events', [])
+                self._events = {event['id']: event for event in events}
+            except (OSError, ValueError, KeyError, AttributeError, TypeError) as e:
+                self.load_error = e
+                raise
+            self.load_error = None
+            self._index = None
+
+    def _save(self):
+        if self.load_error is not None:
+            # Don't replace a file we couldn't read with a partial copy
+            raise RuntimeError(f"{self.filepath.name} could not be loaded: {self.load_error}")
+        tmp_path = self.filepath.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'events': list(self._events.values())}, f, indent=2)
+        os.replace(tmp_path, self.filepath)
+
+    # -- index -----------------------------------------------------------
+
+    def _status(self, event, today):
+        if event.get('cancelled'):
+            return 'cancelled'
+        event_date = parse_event_date(event.get('date'))
+        if event_date is None:
+            return 'unscheduled'
+        return 'upcoming' if event_date >= today else 'past'
+
+    def _ensure_index(self):
+        """Rebuild the date/status index if events changed or the day rolled over."""
+        today = self._today()
+        if self._index is not None and self._index['today'] == today:
+            return self._index
+
+        def sort_key(event):
+            event_date = parse_event_date(event.get('date'))
+            return (event_date is None, event_date or date.max, event['id'])
+
+        by_date = [event['id'] for event in sorted(self._events.values(), key=sort_key)]
+        by_status = {status: [] for status in STATUSES}
+        for event_id in by_date:
+            by_status[self._status(self._events[event_id], today)].append(event_id)
+        # Most recent past event first, so the fallback below picks the latest one
+        by_status['past'].reverse()
+
+        # The active event is the next upcoming one; fall back to the most recent
+        # past event, then to anything without a parseable date.
+        active = None
+        for status in ('upcoming', 'past', 'unscheduled'):
+            if by_status[status]:
+                active = by_status[status][0]
+                break
+
+        self._index = {
+            'today': today,
+            'by_date': by_date,
+            'by_status': by_status,
+            'status': {event_id: status for status, ids in by_status.items() for event_id in ids},
+            'active': active,
+        }
+        return self._index
+
+    def _public(self, event_id, index):
+        event = dict(self._events[event_id])
+        event['status'] = index['status'][event_id]
+        return event
+
+    # -- queries ---------------------------------------------------------
+
+    def list(self, status=None):
+        """Return events in date order, optionally filtered by status."""
+        with self._lock:
+            index = self._ensure_index()
+            if status is None:
+                ids = index['by_date']
+            elif status in STATUSES:
+                ids = index['by_status'][status]
+            else:
+                raise ValueError(f"Unknown event status: {status}")
+            return [self._public(event_id, index) for event_id in ids]
+
+    def get(self, event_id):
+        with self._lock:
+            if event_id not in self._events:
+                raise EventNotFound(event_id)
+            return self._public(event_id, self._ensure_index())
+
+    def active(self):
+        """Return the event shown on the site, or None when there are no events."""
+        with self._lock:
+            index = self._ensure_index()
+            if index['active'] is None:
+                return None
+            return self._public(index['active'], index)
+
+    # -- mutations -------------------------------------------------------
+
+    def create(self, data):
+        with self._lock:
+            event_id = new_id()
+            event = {
+                'id': event_id,
+                'title': data.get('title'),
+                'description': data.get('description'),
+                'date': data.get('date'),
+                'location': data.get('location'),
+                'student_cap': data.get('student_cap'),
+                'volunteer_cap': data.get('volunteer_cap'),
+                'cancelled': bool(data.get('cancelled', False)),
+                'students': 0,
+                'volunteers': 0,
+            }
+            self._events[event_id] = event
+            self._index = None
+            self._save()
+            return self.get(event_id)
+
+    def update(self, event_id, data):
+        with self._lock:
+            if event_id not in self._events:
+                raise EventNotFound(event_id)
+            event = self._events[event_id]
+            for field in EDITABLE_FIELDS:
+                if field in data:
+                    event[field] = data[field]
+            self._index = None
+            self._save()
+            return self.get(event_id)
+
+    def delete(self, event_id):
+        with self._lock:
+            if self._events.pop(event_id, None) is None:
+                raise EventNotFound(event_id)
+            self._index = None
+            self._save()
+
+    def next_upcoming(self):
+        """Return the soonest upcoming event, or None."""
+        with self._lock:
+            index = self._ensure_index()
+            upcoming = index['by_status']['upcoming']
+            return self._public(upcoming[0], index) if upcoming else None
+
+    def register(self, event_id, kind):
+        """Count one registration of ``kind`` against an upcoming event, enforcing its cap."""
+        if kind not in REGISTRATION_KINDS:
+            raise ValueError(f"Unknown registration kind: {kind}")
+        with self._lock:
+            event = self._events.get(event_id)
+            if event is None:
+                raise EventNotFound(event_id)
+            status = self._ensure_index()['status'][event_id]
+            if status != 'upcoming':
+                raise EventClosed(f"Event {event_id} is {status}")
+            cap = event.get('student_cap' if kind == 'students' else 'volunteer_cap')
+            if cap is not None and event.get(kind, 0) >= cap:
+                raise EventFull(f"Event {event_id} is full")
+            event[kind] = event.get(kind, 0) + 1
+            self._save()
+            return event[kind]
+
+    def unregister(self, event_id, kind):
+        """Undo a ``register`` call, e.g. when saving the submission failed."""
+        with self._lock:
+            event = self._events.get(event_id)
+            if event is not None and event.get(kind, 0) > 0:
+                event[kind] -= 1
+                self._save()
@@ -0,0 +1,313 @@
+"""Background email notifications.
+
+Request handlers only call ``NotificationService.enqueue``, which appends one
+line to the outbox journal (``data/outbox.jsonl``). A small pool of asyncio
+workers picks up due messages in batches and sends each batch over a reused
+SMTP connection in a worker thread. Sends that fail with a network or SMTP
+error are retried with exponential backoff; other failures are final. A
+message whose dedup key was already queued for the same recipient is dropped.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import smtplib
+import threading
+import time
+import uuid
+from email.message import EmailMessage
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 30  # seconds before the first retry; doubles after each failure
+BACKOFF_MAX = 3600
+# Sent/failed messages are kept this long so duplicates can still be detected
+RETENTION_SECONDS = 30 * 24 * 3600
+IDLE_POLL_SECONDS = 5
+# Network and server errors may clear up on retry. Anything else (e.g. a
+# ValueError building the message) would fail the same way every time.
+TRANSIENT_ERRORS = (OSError, smtplib.SMTPException)
+
+logger = logging.getLogger(__name__)
+
+
+def dedup_key(recipient, key):
+    return hashlib.sha256(f"{recipient.strip().lower()}|{key}".encode()).hexdigest()
+
+
+class Outbox:
+    """Persistent message queue stored as an append-only JSON-lines journal."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._messages = {}
+        self._keys = set()
+        self._claimed = set()
+        self.load()
+
+    def load(self):
+        with self._lock:
+            self._messages = {}
+            if self.filepath.exists():
+                with open(self.filepath, 'r') as f:
+                    for line in f:
+                        if line.strip():
+                            self._apply(json.loads(line))
+            self._keys = {msg['key'] for msg in self._messages.values()}
+            self._claimed = set()
+
+    def _apply(self, record):
+        op = record['op']
+        if op == 'enqueue':
+            self._messages[record['message']['id']] = record['message']
+        elif record['id'] in self._messages:
+            msg = self._messages[record['id']]
+            msg.update({k: v for k, v in record.items() if k not in ('op', 'id')})
+
+    def _append(self, record):
+        with open(self.filepath, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        self._apply(record)
+
+    def compact(self):
+        """Rewrite the journal with current state, dropping expired messages."""
+        with self._lock:
+            cutoff = time.time() - RETENTION_SECONDS
+            self._messages = {
+                msg_id: msg for msg_id, msg in self._messages.items()
+                if msg['status'] == 'pending' or msg.get('updated_at', msg['created_at']) >= cutoff
+            }
+            self._keys = {msg['key'] for msg in self._messages.values()}
+            tmp_path = self.filepath.with_suffix('.jsonl.tmp')
+            with open(tmp_path, 'w') as f:
+                for msg in self._messages.values():
+                    f.write(json.dumps({'op': 'enqueue', 'message': msg}) + '\n')
+            os.replace(tmp_path, self.filepath)
+
+    def enqueue(self, recipient, subject, body, key):
+        """Queue a message. Returns False if it duplicates an earlier one."""
+        key = dedup_key(recipient, key)
+        with self._lock:
+            if key in self._keys:
+                return False
+            now = time.time()
+            self._keys.add(key)
+            self._append({'op': 'enqueue', 'message': {
+                'id': uuid.uuid4().hex,
+                'key': key,
+                'to': recipient,
+                'subject': subject,
+                'body': body,
+                'status': 'pending',
+                'attempts': 0,
+                'next_attempt_at': now,
+                'created_at': now,
+            }})
+            return True
+
+    def claim(self, limit, now=None):
+        """Take up to ``limit`` due pending messages for sending."""
+        now = time.time() if now is None else now
+        with self._lock:
+            batch = []
+            for msg in self._messages.values():
+                if len(batch) >= limit:
+                    break
+                if msg['status'] == 'pending' and msg['id'] not in self._claimed and msg['next_attempt_at'] <= now:
+                    self._claimed.add(msg['id'])
+                    batch.append(dict(msg))
+            return batch
+
+    def next_due(self):
+        """Return the earliest next_attempt_at among unclaimed pending messages."""
+        with self._lock:
+            due = [msg['next_attempt_at'] for msg in self._messages.values()
+                   if msg['status'] == 'pending' and msg['id'] not in self._claimed]
+            return min(due) if due else None
+
+    def pending_count(self):
+        with self._lock:
+            return sum(1 for msg in self._messages.values() if msg['status'] == 'pending')
+
+    def mark_sent(self, msg_id):
+        with self._lock:
+            self._claimed.discard(msg_id)
+            self._append({'op': 'update', 'id': msg_id, 'status': 'sent', 'updated_at': time.time()})
+
+    def mark_failed_attempt(self, msg_id, error):
+        """Schedule a retry with exponential backoff, or give up after MAX_ATTEMPTS."""
+        with self._lock:
+            self._claimed.discard(msg_id)
+            attempts = self._messages[msg_id]['attempts'] + 1
+            now = time.time()
+            record = {'op': 'update', 'id': msg_id, 'attempts': attempts, 'error': str(error), 'updated_at': now}
+            if attempts >= MAX_ATTEMPTS:
+                record['status'] = 'failed'
+            else:
+                delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+                record['next_attempt_at'] = now + delay + random.uniform(0, delay * 0.1)
+            self._append(record)
+
+    def mark_failed(self, msg_id, error):
+        """Give up on a message that can never be sent, without retrying."""
+        with self._lock:
+            self._claimed.discard(msg_id)
+            attempts = self._messages[msg_id]['attempts'] + 1
+            self._append({'op': 'update', 'id': msg_id, 'attempts': attempts, 'status': 'failed',
+                          'error': str(error), 'updated_at': time.time()})
+
+    def release(self, msg_id):
+        """Return a claimed message to the queue without counting an attempt."""
+        with self._lock:
+            self._claimed.discard(msg_id)
+
+
+class SmtpSender:
+    """Sends batches of messages, keeping the SMTP connection open between batches.
+
+    Each worker owns one sender, so a connection is never shared across threads.
+    """
+
+    def __init__(self, host, port=25, username=None, password=None, starttls=False, from_addr='noreply@localhost', timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.from_addr = from_addr
+        self.timeout = timeout
+        self._smtp = None
+
+    def _connection(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except smtplib.SMTPException:
+                self.close()
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+        return smtp
+
+    def send_batch(self, messages):
+        """Send messages over one connection. Returns a list of (message, error or None)."""
+        results = []
+        try:
+            smtp = self._connection()
+        except (OSError, smtplib.SMTPException) as e:
+            return [(msg, e) for msg in messages]
+        for msg in messages:
+            try:
+                email = EmailMessage()
+                email['From'] = self.from_addr
+                email['To'] = msg['to']
+                email['Subject'] = msg['subject']
+                email.set_content(msg['body'])
+                smtp.send_message(email)
+                results.append((msg, None))
+            except smtplib.SMTPServerDisconnected as e:
+                self._smtp = None
+                results.extend((pending, e) for pending in messages[len(results):])
+                break
+            except Exception as e:
+                # A malformed message (e.g. a header with a newline) fails on its own
+                # without taking the rest of the batch down with it.
+                results.append((msg, e))
+        return results
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+            self._smtp = None
+
+
+class NotificationService:
+    """Runs a pool of workers that drain the outbox."""
+
+    def __init__(self, outbox, sender_factory, workers=2, batch_size=20):
+        self.outbox = outbox
+        self.sender_factory = sender_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self._tasks = []
+        self._senders = []
+        self._wakeup = None
+        self._stopping = False
+
+    def enqueue(self, recipient, subject, body, key):
+        """Queue a message for background delivery. Returns False for duplicates."""
+        queued = self.outbox.enqueue(recipient, subject, body, key)
+        if queued and self._wakeup is not None:
+            self._wakeup.set()
+        return queued
+
+    async def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._senders = [self.sender_factory() for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._run(sender)) for sender in self._senders]
+        logger.info('Notification workers started (%d workers, %d pending)', self.workers, self.outbox.pending_count())
+
+    async def stop(self, timeout):
+        """Let workers finish their current batch, then close connections and compact the outbox."""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._tasks:
+            _, still_running = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in still_running:
+                task.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
+        for sender in self._senders:
+            await asyncio.to_thread(sender.close)
+        self._tasks = []
+        self._senders = []
+        await asyncio.to_thread(self.outbox.compact)
+
+    async def _run(self, sender):
+        while not self._stopping:
+            batch = self.outbox.claim(self.batch_size)
+            if not batch:
+                await self._idle()
+                continue
+            try:
+                results = await asyncio.to_thread(sender.send_batch, batch)
+            except asyncio.CancelledError:
+                for msg in batch:
+                    self.outbox.release(msg['id'])
+                raise
+            except Exception as e:
+                # Never let one bad batch end the worker
+                logger.exception('Notification batch failed')
+                results = [(msg, e) for msg in batch]
+            for msg, error in results:
+                try:
+                    if error is None:
+                        self.outbox.mark_sent(msg['id'])
+                    elif isinstance(error, TRANSIENT_ERRORS):
+                        logger.warning('Sending notification to %s failed: %s', msg['to'], error)
+                        self.outbox.mark_failed_attempt(msg['id'], error)
+                    else:
+                        logger.error('Notification to %s cannot be sent: %s', msg['to'], error)
+                        self.outbox.mark_failed(msg['id'], error)
+                except Exception:
+                    logger.exception('Could not record notification result for %s', msg['id'])
+                    self.outbox.release(msg['id'])
+
+    async def _idle(self):
+        next_due = self.outbox.next_due()
+        wait = IDLE_POLL_SECONDS if next_due is None else min(max(next_due - time.time(), 0), IDLE_POLL_SECONDS)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
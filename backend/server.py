@@ -1,23 +1,83 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Request
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager, contextmanager
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel
-import uuid
-from datetime import datetime, timezone
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 import hashlib
+import hmac
+import secrets
 import json
-import re
+import csv
+import io
+import asyncio
+import threading
+import time
+
+from archive import SubmissionArchive
+from event_store import EventStore, EventNotFound, EventFull, EventClosed
+from notifications import NotificationService, Outbox, SmtpSender
+from validation import ValidationError, id_timestamp, new_id, normalize_age, normalize_email, normalize_phone
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # Excel storage is optional. Set USE_EXCEL=true locally to enable Excel files.
 USE_EXCEL = os.environ.get('USE_EXCEL', 'false').lower() == 'true'
-
-app = FastAPI()
+# Seconds to wait for in-flight writes to finish when the server shuts down
+SHUTDOWN_TIMEOUT = float(os.environ.get('SHUTDOWN_TIMEOUT', '10'))
+# Opt-in: when set above 0, submissions older than this many days are moved to
+# the archive at startup (Excel mode only). /api/admin/archive works either way.
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '0'))
+# Confirmation emails are sent only when SMTP_HOST is configured
+SMTP_HOST = os.environ.get('SMTP_HOST', '').strip()
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
+SMTP_USER = os.environ.get('SMTP_USER') or None
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD') or None
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', 'true').lower() == 'true'
+NOTIFY_FROM = os.environ.get('NOTIFY_FROM', 'noreply@localhost')
+ORGANIZER_EMAIL = os.environ.get('ORGANIZER_EMAIL', '').strip()
+NOTIFY_WORKERS = int(os.environ.get('NOTIFY_WORKERS', '2'))
+NOTIFY_BATCH_SIZE = int(os.environ.get('NOTIFY_BATCH_SIZE', '20'))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm caches and validate data files at startup; drain writes at shutdown.
+
+    `/api/health/ready` only reports ready once warm-up has finished, so an
+    orchestrator can hold traffic back until then.
+    """
+    app.state.ready = False
+    app.state.data_file_errors = await asyncio.to_thread(validate_data_files)
+    for error in app.state.data_file_errors:
+        logging.error('Data file check failed: %s', error)
+    if USE_EXCEL and ARCHIVE_AFTER_DAYS > 0 and not app.state.data_file_errors:
+        await asyncio.to_thread(archive_submissions, ARCHIVE_AFTER_DAYS)
+    await asyncio.to_thread(warm_caches)
+    if SMTP_HOST:
+        await notification_service.start()
+    app.state.ready = not app.state.data_file_errors
+    logging.info('Startup complete (ready=%s)', app.state.ready)
+
+    yield
+
+    app.state.ready = False
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    drained = await asyncio.to_thread(wait_for_writes, SHUTDOWN_TIMEOUT)
+    if not drained:
+        logging.warning('Shutdown timeout reached with writes still in flight')
+    if SMTP_HOST:
+        await notification_service.stop(max(0, deadline - time.monotonic()))
+    logging.info('Shutdown complete')
+
+
+app = FastAPI(lifespan=lifespan)
 api_router = APIRouter(prefix="/api")
 
 EXCEL_DIR = ROOT_DIR / 'data'
@@ -26,8 +86,28 @@ STUDENTS_FILE = EXCEL_DIR / 'student_registrations.xlsx'
 VOLUNTEERS_FILE = EXCEL_DIR / 'volunteer_registrations.xlsx'
 CONTACTS_FILE = EXCEL_DIR / 'contact_messages.xlsx'
 COUNTS_FILE = EXCEL_DIR / 'counts.json'
+EVENT_FILE = EXCEL_DIR / 'event_content.xlsx'
+EVENTS_FILE = EXCEL_DIR / 'events.json'
+OUTBOX_FILE = EXCEL_DIR / 'outbox.jsonl'
+ARCHIVE_DIR = EXCEL_DIR / 'archive'
 MAX_REGISTRATIONS = 1000
+EXCEL_HEADERS = {
+    STUDENTS_FILE: ['ID', 'Name', 'Age', 'School', 'Email', 'Phone', 'Timestamp', 'Event ID'],
+    VOLUNTEERS_FILE: ['ID', 'Name', 'Email', 'Phone', 'School/Organization', 'Timestamp', 'Event ID'],
+    CONTACTS_FILE: ['ID', 'Name', 'Email', 'Message', 'Timestamp'],
+}
+# Column index of each file's Timestamp, used to date rows for archival
+TIMESTAMP_COLUMNS = {filepath: headers.index('Timestamp') for filepath, headers in EXCEL_HEADERS.items()}
+SUBMISSION_FILES = {
+    'students': STUDENTS_FILE,
+    'volunteers': VOLUNTEERS_FILE,
+    'contacts': CONTACTS_FILE,
+}
 ADMIN_PASSWORD_HASH = hashlib.sha256("admin123".encode()).hexdigest()
+# Signs admin tokens. Set ADMIN_TOKEN_SECRET so tokens survive restarts and are
+# accepted by every worker process; otherwise a random per-process key is used.
+ADMIN_TOKEN_SECRET = os.environ.get('ADMIN_TOKEN_SECRET', '').encode() or secrets.token_bytes(32)
+ADMIN_TOKEN_TTL = int(os.environ.get('ADMIN_TOKEN_TTL', str(12 * 3600)))
 
 if USE_EXCEL:
     try:
@@ -36,16 +116,26 @@ if USE_EXCEL:
         raise ImportError("openpyxl is required when USE_EXCEL=true; install it in backend/requirements.txt")
 
     def init_excel_file(filepath, headers):
-        if not filepath.exists():
+        # Zero-byte placeholders are treated as missing and recreated
+        if not filepath.exists() or filepath.stat().st_size == 0:
             wb = Workbook()
             ws = wb.active
             ws.append(headers)
             wb.save(filepath)
+            return
+        # Workbooks created before a column was added get the missing headers;
+        # their existing rows simply leave the new columns empty.
+        wb = load_workbook(filepath)
+        ws = wb.active
+        found = [cell.value for cell in ws[1]]
+        if len(found) < len(headers) and found == headers[:len(found)]:
+            for column, header in enumerate(headers[len(found):], start=len(found) + 1):
+                ws.cell(row=1, column=column, value=header)
+            wb.save(filepath)
+        wb.close()
 
-    init_excel_file(STUDENTS_FILE, ['ID', 'Name', 'Age', 'School', 'Email', 'Phone', 'Timestamp'])
-    init_excel_file(VOLUNTEERS_FILE, ['ID', 'Name', 'Email', 'Phone', 'School/Organization', 'Timestamp'])
-    init_excel_file(CONTACTS_FILE, ['ID', 'Name', 'Email', 'Message', 'Timestamp'])
-    init_excel_file(EVENT_FILE if (EVENT_FILE := EXCEL_DIR / 'event_content.xlsx') else EVENT_FILE, ['title', 'description', 'date', 'location'])
+    for filepath, headers in EXCEL_HEADERS.items():
+        init_excel_file(filepath, headers)
 else:
     # Ensure counts.json exists for Netlify/production mode (no Excel persistence)
     if not COUNTS_FILE.exists():
@@ -59,12 +149,14 @@ class StudentRegistration(BaseModel):
     email: str
     phone: str
     consent: bool
+    event_id: Optional[str] = None
 
 class VolunteerRegistration(BaseModel):
     name: str
     email: str
     phone: str
     organization: str
+    event_id: Optional[str] = None
 
 class ContactMessage(BaseModel):
     name: str
@@ -77,6 +169,35 @@ class EventContent(BaseModel):
     date: str
     location: str
 
+class EventCreate(EventContent):
+    student_cap: Optional[int] = Field(None, ge=0)
+    volunteer_cap: Optional[int] = Field(None, ge=0)
+    cancelled: bool = False
+
+class EventUpdate(BaseModel):
+    # Omitted fields are left unchanged; null is only meaningful for the caps
+    # (it removes the cap), so it is rejected everywhere else.
+    title: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[str] = None
+    location: Optional[str] = None
+    student_cap: Optional[int] = Field(None, ge=0)
+    volunteer_cap: Optional[int] = Field(None, ge=0)
+    cancelled: Optional[bool] = None
+
+    @field_validator('title', 'description', 'date', 'location', 'cancelled')
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError('may not be null')
+        return value
+
+class Event(EventCreate):
+    id: str
+    status: str
+    students: int
+    volunteers: int
+
 class AdminLogin(BaseModel):
     password: str
 
@@ -103,7 +224,32 @@ def _save_counts(counts):
     with open(COUNTS_FILE, 'w') as f:
         json.dump(counts, f)
 
-def get_row_count(filepath):
+# Row counts per file, filled on first read (or at startup) and kept current
+# by add_to_excel so count lookups don't reopen the workbook.
+_row_count_cache = {}
+
+# Writes currently in progress; shutdown waits for this to reach zero.
+_writes_in_flight = 0
+_writes_done = threading.Condition()
+
+@contextmanager
+def _track_write():
+    global _writes_in_flight
+    with _writes_done:
+        _writes_in_flight += 1
+    try:
+        yield
+    finally:
+        with _writes_done:
+            _writes_in_flight -= 1
+            _writes_done.notify_all()
+
+def wait_for_writes(timeout):
+    """Block until no writes are in flight. Returns False if the timeout expired."""
+    with _writes_done:
+        return _writes_done.wait_for(lambda: _writes_in_flight == 0, timeout=timeout)
+
+def _read_row_count(filepath):
     if not USE_EXCEL:
         counts = _ensure_counts()
         return counts.get('students', 0) if filepath == STUDENTS_FILE else counts.get('volunteers', 0)
@@ -116,7 +262,40 @@ def get_row_count(filepath):
     wb.close()
     return max(0, count)
 
-def add_to_excel(filepath, data):
+def get_row_count(filepath):
+    if filepath not in _row_count_cache:
+        _row_count_cache[filepath] = _read_row_count(filepath)
+    return _row_count_cache[filepath]
+
+def get_registration_total(filepath):
+    """Rows in the hot workbook plus rows moved to the archive.
+
+    MAX_REGISTRATIONS applies to this total, so archiving never resets it.
+    """
+    archived = sum(archives[kind].row_count() for kind, path in SUBMISSION_FILES.items() if path == filepath)
+    return get_row_count(filepath) + archived
+
+# Serializes workbook writes so archival never races an append
+_excel_lock = threading.Lock()
+
+class RegistrationLimitReached(Exception):
+    pass
+
+def add_to_excel(filepath, data, limit=None):
+    """Append a submission row. Blocking; handlers run it with asyncio.to_thread.
+
+    With ``limit`` set, the row is only added while the registration total is
+    below it. The check happens under the write lock, so concurrent requests
+    can't all pass it before any of them has written.
+    """
+    with _excel_lock, _track_write():
+        if limit is not None and get_registration_total(filepath) >= limit:
+            raise RegistrationLimitReached(filepath.name)
+        _append_submission(filepath, data)
+        if filepath in _row_count_cache:
+            _row_count_cache[filepath] += 1
+
+def _append_submission(filepath, data):
     # When Excel is disabled, update the simple JSON counts and log the submission
     if not USE_EXCEL:
         counts = _ensure_counts()
@@ -150,22 +329,248 @@ def read_event_file(filepath):
     return dict(zip(headers, values))
 
 
-def write_event_file(filepath, event_dict):
-    wb = Workbook()
-    ws = wb.active
-    ws.append(['title', 'description', 'date', 'location'])
-    ws.append([event_dict.get('title'), event_dict.get('description'), event_dict.get('date'), event_dict.get('location')])
-    wb.save(filepath)
-    wb.close()
+archives = {kind: SubmissionArchive(ARCHIVE_DIR / kind) for kind in SUBMISSION_FILES}
+
+
+def _row_timestamp(row, filepath):
+    """Epoch seconds from a row's Timestamp column, or None if unparseable."""
+    try:
+        return datetime.fromisoformat(str(row[TIMESTAMP_COLUMNS[filepath]])).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _archive_file(kind, cutoff):
+    """Move rows older than ``cutoff`` from a hot workbook into a new archive segment."""
+    filepath = SUBMISSION_FILES[kind]
+    archive = archives[kind]
+    with _excel_lock, _track_write():
+        wb = load_workbook(filepath, read_only=True)
+        rows = list(wb.active.iter_rows(values_only=True))
+        wb.close()
+        if len(rows) < 2:
+            return 0
+        headers, body = rows[0], rows[1:]
+        ts_column = TIMESTAMP_COLUMNS[filepath]
+        dated = [(_row_timestamp(row, filepath), row) for row in body]
+        # A run that stopped after writing its segment but before rewriting the
+        # workbook leaves rows in both places. Only rows whose (ID, Timestamp)
+        # is already in the archive are dropped, so back-filled older rows are
+        # archived or kept like any other row.
+        archived_until = archive.max_timestamp
+        candidates = [ts for ts, _ in dated if ts is not None and archived_until is not None and ts <= archived_until]
+        archived_keys = set()
+        if candidates:
+            archived_keys = {
+                (str(row[0]), str(row[ts_column]))
+                for row in archive.iter_rows(min(candidates), archived_until)
+                if len(row) > ts_column
+            }
+        old, keep, duplicates = [], [], 0
+        for ts, row in dated:
+            if archived_keys and (str(row[0]), str(row[ts_column])) in archived_keys:
+                duplicates += 1
+            elif ts is not None and ts < cutoff:
+                old.append((ts, row))
+            else:
+                keep.append(row)
+        if not old and not duplicates:
+            return 0
+        if duplicates:
+            logging.warning('Dropped %d %s rows that were already archived', duplicates, kind)
+
+        archive.write_segment(headers, old)
+        wb = Workbook()
+        ws = wb.active
+        ws.append(list(headers))
+        for row in keep:
+            ws.append(list(row))
+        tmp_path = filepath.with_name(filepath.stem + '.tmp.xlsx')
+        wb.save(tmp_path)
+        wb.close()
+        os.replace(tmp_path, filepath)
+        _row_count_cache[filepath] = len(keep)
+    logging.info('Archived %d %s rows older than %s', len(old), kind, datetime.fromtimestamp(cutoff, timezone.utc).isoformat())
+    return len(old)
+
+
+def archive_submissions(older_than_days):
+    """Archive every submission file. Returns the number of rows moved per kind."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).timestamp()
+    return {kind: _archive_file(kind, cutoff) for kind in SUBMISSION_FILES}
+
+
+def _hot_rows(kind):
+    filepath = SUBMISSION_FILES[kind]
+    with _excel_lock:
+        wb = load_workbook(filepath, read_only=True)
+        rows = list(wb.active.iter_rows(values_only=True))
+        wb.close()
+    return rows[1:]
+
+
+def iter_submissions(kind, since=None, until=None):
+    """Yield archived then hot rows, oldest first, within [since, until] epoch seconds."""
+    yield from archives[kind].iter_rows(since, until)
+    for row in _hot_rows(kind):
+        ts = _row_timestamp(row, SUBMISSION_FILES[kind])
+        if ts is None or ((since is None or ts >= since) and (until is None or ts <= until)):
+            yield list(row)
+
+
+def find_submission(kind, row_id):
+    for row in _hot_rows(kind):
+        if row and row[0] == row_id:
+            return list(row)
+    return archives[kind].find(row_id, id_timestamp(row_id))
+
+
+def validate_data_files():
+    """Check that the data files can be read. Returns a list of problems found."""
+    errors = []
+    if USE_EXCEL:
+        for filepath, headers in EXCEL_HEADERS.items():
+            try:
+                wb = load_workbook(filepath, read_only=True)
+                found = [cell.value for cell in next(wb.active.iter_rows(min_row=1, max_row=1))]
+                wb.close()
+            except Exception as e:
+                errors.append(f"{filepath.name}: {e}")
+                continue
+            if found != headers:
+                errors.append(f"{filepath.name}: unexpected headers {found}")
+    else:
+        try:
+            counts = _ensure_counts()
+            if not all(isinstance(counts.get(key, 0), int) for key in ('students', 'volunteers')):
+                errors.append(f"{COUNTS_FILE.name}: counts must be integers")
+        except (OSError, ValueError) as e:
+            errors.append(f"{COUNTS_FILE.name}: {e}")
+    try:
+        event_store.load()
+    except (OSError, ValueError, KeyError, AttributeError, TypeError) as e:
+        errors.append(f"{EVENTS_FILE.name}: {e}")
+    return errors
+
+
+def warm_caches():
+    """Load row counts and the active event into memory before serving traffic."""
+    for filepath in (STUDENTS_FILE, VOLUNTEERS_FILE):
+        _row_count_cache[filepath] = _read_row_count(filepath)
+    event_store.active()
+
+
+DEFAULT_EVENT = {
+    "title": "Annual Spell-Bee Competition 2025",
+    "description": "Join us for an exciting spelling competition showcasing English language proficiency. Open to students from grades 3-12.",
+    "date": "March 15, 2025",
+    "location": "Community Center Auditorium"
+}
+
+event_store = EventStore(EVENTS_FILE, load=False)
+try:
+    event_store.load()
+except (OSError, ValueError, KeyError, AttributeError, TypeError) as e:
+    # Don't fail the import: validate_data_files reports it again at startup
+    # and /api/health/ready stays 503.
+    logging.error('Could not load %s: %s', EVENTS_FILE.name, e)
+else:
+    # Carry over the single event from the legacy event_content.xlsx on first run
+    if not event_store.list() and USE_EXCEL:
+        legacy_event = read_event_file(EVENT_FILE)
+        if legacy_event:
+            event_store.create(legacy_event)
+
+notification_service = NotificationService(
+    Outbox(OUTBOX_FILE),
+    lambda: SmtpSender(SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_STARTTLS, NOTIFY_FROM),
+    workers=NOTIFY_WORKERS,
+    batch_size=NOTIFY_BATCH_SIZE,
+)
+
+
+def notify(recipient, subject, body, key):
+    """Queue an email for background delivery; never fails the calling request."""
+    if not SMTP_HOST or not recipient:
+        return
+    try:
+        notification_service.enqueue(recipient, subject, body, key)
+    except Exception:
+        logging.exception('Failed to queue notification for %s', recipient)
+
+
+def _single_line(value):
+    """Collapse CR/LF and other whitespace runs so user input is safe in a header."""
+    return ' '.join(str(value).split())
+
+
+def notify_registration(kind, registration_id, name, email, event_id):
+    """Send the registrant a confirmation and tell the organizers."""
+    name = _single_line(name)
+    try:
+        event = event_store.get(event_id) if event_id else None
+    except EventNotFound:
+        event = None
+    event_title = _single_line(event['title']) if event else 'our upcoming event'
+    label = 'student' if kind == 'students' else 'volunteer'
+    # Keyed by event and name so a double-submitted form sends one confirmation,
+    # while siblings registered with the same parent email each get their own.
+    notify(
+        email,
+        f"Registration confirmed: {event_title}",
+        f"Hello,\n\n{name} is registered as a {label} for {event_title}"
+        + (f" on {event['date']} at {event['location']}" if event else '')
+        + f".\nYour registration ID is {registration_id}.\n\nThank you!",
+        f"{kind}:{event_id}:{name.strip().lower()}",
+    )
+    notify(
+        ORGANIZER_EMAIL,
+        f"New {label} registration: {name}",
+        f"{name} ({email}) registered as a {label} for {event_title}. ID: {registration_id}",
+        f"{kind}:{registration_id}",
+    )
+
+
+def reserve_event_slot(event_id, kind):
+    """Count a registration against the requested (or next upcoming) event.
+
+    Returns the event id the registration was tied to, or None when no event
+    was requested and none is upcoming.
+    """
+    if event_id is None:
+        upcoming = event_store.next_upcoming()
+        if upcoming is None:
+            return None
+        event_id = upcoming['id']
+    try:
+        event_store.register(event_id, kind)
+    except EventNotFound:
+        raise HTTPException(status_code=404, detail="Event not found")
+    except EventClosed:
+        raise HTTPException(status_code=400, detail="Registration is closed for this event")
+    except EventFull:
+        raise HTTPException(status_code=400, detail="Registration limit reached for this event")
+    return event_id
 
 @api_router.get("/")
 async def root():
     return {"message": "Non-Profit Competition Portal API"}
 
+@api_router.get("/health/live")
+async def liveness():
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness(response: Response):
+    ready = getattr(app.state, 'ready', False)
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "starting", "errors": getattr(app.state, 'data_file_errors', [])}
+
 @api_router.get("/registrations/count", response_model=RegistrationCount)
 async def get_registration_count():
-    students_count = get_row_count(STUDENTS_FILE)
-    volunteers_count = get_row_count(VOLUNTEERS_FILE)
+    students_count = get_registration_total(STUDENTS_FILE)
+    volunteers_count = get_registration_total(VOLUNTEERS_FILE)
     return RegistrationCount(
         students=students_count,
         volunteers=volunteers_count,
@@ -173,6 +578,21 @@ async def get_registration_count():
         volunteers_limit_reached=volunteers_count >= MAX_REGISTRATIONS
     )
 
+def _normalize_webhook_field(normalizer, value):
+    """Normalize a webhook field, keeping the raw value when it doesn't validate.
+
+    Netlify has already accepted the submission, so rejecting it here would
+    only lose the row.
+    """
+    # Netlify may send numbers (e.g. "age": 12); the normalizers expect strings
+    if value is not None and not isinstance(value, str):
+        value = str(value)
+    try:
+        return normalizer(value)
+    except (ValidationError, TypeError) as e:
+        logging.warning('Netlify webhook field kept as submitted: %s', e)
+        return value
+
 @api_router.post("/netlify/webhook")
 async def netlify_webhook(request: Request):
     """Endpoint for Netlify form submission webhooks.
@@ -210,23 +630,23 @@ async def netlify_webhook(request: Request):
     if form_name == 'student-registration':
         # payload may contain a `data` or `fields` mapping depending on Netlify configuration
         data = payload.get('data') or payload.get('fields') or {}
-        add_to_excel(STUDENTS_FILE, [
-            'netlify',
+        await asyncio.to_thread(add_to_excel, STUDENTS_FILE, [
+            new_id(),
             data.get('name', 'Netlify Submission'),
-            data.get('age', ''),
+            _normalize_webhook_field(normalize_age, data.get('age', '')),
             data.get('school', ''),
-            data.get('email', ''),
-            data.get('phone', ''),
+            _normalize_webhook_field(normalize_email, data.get('email', '')),
+            _normalize_webhook_field(normalize_phone, data.get('phone', '')),
             timestamp
         ])
         logging.info('Netlify webhook processed for student-registration')
     elif form_name == 'volunteer-registration':
         data = payload.get('data') or payload.get('fields') or {}
-        add_to_excel(VOLUNTEERS_FILE, [
-            'netlify',
+        await asyncio.to_thread(add_to_excel, VOLUNTEERS_FILE, [
+            new_id(),
             data.get('name', 'Netlify Submission'),
-            data.get('email', ''),
-            data.get('phone', ''),
+            _normalize_webhook_field(normalize_email, data.get('email', '')),
+            _normalize_webhook_field(normalize_phone, data.get('phone', '')),
             data.get('organization', ''),
             timestamp
         ])
@@ -238,100 +658,270 @@ async def netlify_webhook(request: Request):
 
 @api_router.post("/students/register")
 async def register_student(student: StudentRegistration):
-    students_count = get_row_count(STUDENTS_FILE)
+    # Cheap early rejection; add_to_excel re-checks the limit atomically
+    students_count = get_registration_total(STUDENTS_FILE)
     if students_count >= MAX_REGISTRATIONS:
         raise HTTPException(status_code=400, detail="Registration limit reached")
 
     if not student.consent:
         raise HTTPException(status_code=400, detail="Consent is required")
 
-    # Phone validation: strip non-digits and enforce max 10 digits
-    phone_digits = re.sub(r'\D', '', student.phone or '')
-    if len(phone_digits) > 10:
-        raise HTTPException(status_code=400, detail="Phone number must be at most 10 digits")
-
-    student_id = str(uuid.uuid4())[:8]
+    try:
+        age = normalize_age(student.age)
+        email = normalize_email(student.email)
+        phone_digits = normalize_phone(student.phone)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    event_id = reserve_event_slot(student.event_id, 'students')
+    student_id = new_id()
     timestamp = datetime.now(timezone.utc).isoformat()
 
-    add_to_excel(STUDENTS_FILE, [
-        student_id,
-        student.name,
-        student.age,
-        student.school,
-        student.email,
-        phone_digits,
-        timestamp
-    ])
+    try:
+        await asyncio.to_thread(add_to_excel, STUDENTS_FILE, [
+            student_id,
+            student.name,
+            age,
+            student.school,
+            email,
+            phone_digits,
+            timestamp,
+            event_id or ''
+        ], MAX_REGISTRATIONS)
+    except RegistrationLimitReached:
+        if event_id:
+            event_store.unregister(event_id, 'students')
+        raise HTTPException(status_code=400, detail="Registration limit reached")
+    except Exception:
+        if event_id:
+            event_store.unregister(event_id, 'students')
+        raise
+
+    notify_registration('students', student_id, student.name, email, event_id)
 
-    return {"message": "Registration successful", "id": student_id}
+    return {"message": "Registration successful", "id": student_id, "event_id": event_id}
 
 @api_router.post("/volunteers/register")
 async def register_volunteer(volunteer: VolunteerRegistration):
-    volunteers_count = get_row_count(VOLUNTEERS_FILE)
+    volunteers_count = get_registration_total(VOLUNTEERS_FILE)
     if volunteers_count >= MAX_REGISTRATIONS:
         raise HTTPException(status_code=400, detail="Registration limit reached")
 
-    # Phone validation: strip non-digits and enforce max 10 digits
-    phone_digits = re.sub(r'\D', '', volunteer.phone or '')
-    if len(phone_digits) > 10:
-        raise HTTPException(status_code=400, detail="Phone number must be at most 10 digits")
+    try:
+        email = normalize_email(volunteer.email)
+        phone_digits = normalize_phone(volunteer.phone)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    volunteer_id = str(uuid.uuid4())[:8]
+    event_id = reserve_event_slot(volunteer.event_id, 'volunteers')
+    volunteer_id = new_id()
     timestamp = datetime.now(timezone.utc).isoformat()
 
-    add_to_excel(VOLUNTEERS_FILE, [
-        volunteer_id,
-        volunteer.name,
-        volunteer.email,
-        phone_digits,
-        volunteer.organization,
-        timestamp
-    ])
+    try:
+        await asyncio.to_thread(add_to_excel, VOLUNTEERS_FILE, [
+            volunteer_id,
+            volunteer.name,
+            email,
+            phone_digits,
+            volunteer.organization,
+            timestamp,
+            event_id or ''
+        ], MAX_REGISTRATIONS)
+    except RegistrationLimitReached:
+        if event_id:
+            event_store.unregister(event_id, 'volunteers')
+        raise HTTPException(status_code=400, detail="Registration limit reached")
+    except Exception:
+        if event_id:
+            event_store.unregister(event_id, 'volunteers')
+        raise
 
-    return {"message": "Registration successful", "id": volunteer_id}
+    notify_registration('volunteers', volunteer_id, volunteer.name, email, event_id)
+
+    return {"message": "Registration successful", "id": volunteer_id, "event_id": event_id}
 
 @api_router.post("/contact")
 async def submit_contact(contact: ContactMessage):
-    contact_id = str(uuid.uuid4())[:8]
+    try:
+        email = normalize_email(contact.email)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    contact_id = new_id()
     timestamp = datetime.now(timezone.utc).isoformat()
-    
-    add_to_excel(CONTACTS_FILE, [
+
+    await asyncio.to_thread(add_to_excel, CONTACTS_FILE, [
         contact_id,
         contact.name,
-        contact.email,
+        email,
         contact.message,
         timestamp
     ])
-    
+
+    message_digest = hashlib.sha256(contact.message.encode()).hexdigest()[:16]
+    notify(
+        email,
+        "We received your message",
+        f"Hello {contact.name},\n\nThanks for getting in touch. We will reply as soon as we can.",
+        f"contact:{message_digest}",
+    )
+    notify(
+        ORGANIZER_EMAIL,
+        f"New contact message from {_single_line(contact.name)}",
+        f"From: {contact.name} <{email}>\n\n{contact.message}",
+        f"contact:{contact_id}",
+    )
+
     return {"message": "Message sent successfully", "id": contact_id}
 
+def _sign_admin_token(expires):
+    return hmac.new(ADMIN_TOKEN_SECRET, str(expires).encode(), hashlib.sha256).hexdigest()
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Dependency for admin routes: requires `Authorization: Bearer <token>` from /admin/login."""
+    scheme, _, token = (authorization or '').partition(' ')
+    expires, _, signature = token.partition('.')
+    # Header values may hold any Latin-1 character: isdigit() also accepts
+    # e.g. '²', which int() rejects, and compare_digest() raises on non-ASCII
+    # str, so check for ASCII and compare bytes.
+    if (scheme.lower() != 'bearer' or not (expires.isascii() and expires.isdigit())
+            or int(expires) < time.time()
+            or not hmac.compare_digest(signature.encode(), _sign_admin_token(int(expires)).encode())):
+        raise HTTPException(status_code=401, detail="Invalid or expired admin token")
+
 @api_router.post("/admin/login", response_model=AdminToken)
 async def admin_login(credentials: AdminLogin):
     password_hash = hashlib.sha256(credentials.password.encode()).hexdigest()
     if password_hash != ADMIN_PASSWORD_HASH:
         raise HTTPException(status_code=401, detail="Invalid password")
     
-    token = hashlib.sha256(f"{credentials.password}{datetime.now(timezone.utc)}".encode()).hexdigest()
-    return AdminToken(token=token)
+    expires = int(time.time()) + ADMIN_TOKEN_TTL
+    return AdminToken(token=f"{expires}.{_sign_admin_token(expires)}")
 
 @api_router.get("/admin/event", response_model=EventContent)
 async def get_event_content():
-    event = read_event_file(EVENT_FILE)
+    """Return the active event (next upcoming, else most recent past)."""
+    event = event_store.active()
     if not event:
-        default_event = {
-            "title": "Annual Spell-Bee Competition 2025",
-            "description": "Join us for an exciting spelling competition showcasing English language proficiency. Open to students from grades 3-12.",
-            "date": "March 15, 2025",
-            "location": "Community Center Auditorium"
-        }
-        write_event_file(EVENT_FILE, default_event)
-        return EventContent(**default_event)
-    return EventContent(**event) 
+        event = event_store.create(DEFAULT_EVENT)
+    return EventContent(**event)
 
 @api_router.put("/admin/event")
 async def update_event_content(event: EventContent):
-    write_event_file(EVENT_FILE, event.model_dump())
-    return {"message": "Event updated successfully"} 
+    active = event_store.active()
+    if active:
+        event_store.update(active['id'], event.model_dump())
+    else:
+        event_store.create(event.model_dump())
+    return {"message": "Event updated successfully"}
+
+@api_router.get("/events", response_model=List[Event])
+async def list_events(status: Optional[str] = None):
+    try:
+        return event_store.list(status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.get("/events/{event_id}", response_model=Event)
+async def get_event(event_id: str):
+    try:
+        return event_store.get(event_id)
+    except EventNotFound:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+@api_router.post("/admin/events", response_model=Event, dependencies=[Depends(require_admin)])
+async def create_event(event: EventCreate):
+    return event_store.create(event.model_dump())
+
+@api_router.put("/admin/events/{event_id}", response_model=Event, dependencies=[Depends(require_admin)])
+async def update_event(event_id: str, event: EventUpdate):
+    try:
+        return event_store.update(event_id, event.model_dump(exclude_unset=True))
+    except EventNotFound:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+@api_router.delete("/admin/events/{event_id}", dependencies=[Depends(require_admin)])
+async def delete_event(event_id: str):
+    try:
+        event_store.delete(event_id)
+    except EventNotFound:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return {"message": "Event deleted successfully"}
+
+def _submission_kind(kind):
+    if not USE_EXCEL:
+        raise HTTPException(status_code=400, detail="Submission storage requires USE_EXCEL=true")
+    if kind not in SUBMISSION_FILES:
+        raise HTTPException(status_code=404, detail="Unknown submission type")
+    return kind
+
+def _parse_time(value):
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+@api_router.post("/admin/archive", dependencies=[Depends(require_admin)])
+async def run_archive(older_than_days: int):
+    if not USE_EXCEL:
+        raise HTTPException(status_code=400, detail="Submission storage requires USE_EXCEL=true")
+    if older_than_days < 1:
+        raise HTTPException(status_code=400, detail="older_than_days must be at least 1")
+    archived = await asyncio.to_thread(archive_submissions, older_than_days)
+    return {"message": "Archive complete", "archived": archived}
+
+@api_router.get("/admin/submissions/{kind}", dependencies=[Depends(require_admin)])
+async def search_submissions(kind: str, q: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, limit: int = 100):
+    """Search hot and archived submissions; `q` matches any cell, case-insensitively."""
+    kind = _submission_kind(kind)
+    since_ts, until_ts = _parse_time(since), _parse_time(until)
+    needle = q.lower() if q else None
+
+    def search():
+        matches = []
+        for row in iter_submissions(kind, since_ts, until_ts):
+            if needle is None or any(needle in str(cell).lower() for cell in row if cell is not None):
+                matches.append(row)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    return {"headers": EXCEL_HEADERS[SUBMISSION_FILES[kind]], "rows": await asyncio.to_thread(search)}
+
+@api_router.get("/admin/submissions/{kind}/export", dependencies=[Depends(require_admin)])
+async def export_submissions(kind: str, since: Optional[str] = None, until: Optional[str] = None):
+    kind = _submission_kind(kind)
+    since_ts, until_ts = _parse_time(since), _parse_time(until)
+
+    def rows_as_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXCEL_HEADERS[SUBMISSION_FILES[kind]])
+        for row in iter_submissions(kind, since_ts, until_ts):
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        rows_as_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={kind}.csv"},
+    )
+
+@api_router.get("/admin/submissions/{kind}/{row_id}", dependencies=[Depends(require_admin)])
+async def get_submission(kind: str, row_id: str):
+    kind = _submission_kind(kind)
+    row = await asyncio.to_thread(find_submission, kind, row_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return {"headers": EXCEL_HEADERS[SUBMISSION_FILES[kind]], "row": row}
 
 app.include_router(api_router)
 
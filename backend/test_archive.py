@@ -0,0 +1,20 @@
+import tempfile
+import time
+from pathlib import Path
+
+from archive import SubmissionArchive
+from validation import IdGenerator, id_timestamp
+
+archive = SubmissionArchive(Path(tempfile.mkdtemp()) / 'students')
+start = time.time() - 365 * 24 * 3600
+rows = []
+for i in range(1000):
+    ts = start + i * 3600
+    row_id = IdGenerator(clock=lambda: ts).new_id()
+    rows.append((ts, [row_id, f'Student {i}', '12', 'Test School', 'parent@example.com', '1234567890', '']))
+archive.write_segment(['ID', 'Name', 'Age', 'School', 'Email', 'Phone', 'Timestamp'], rows)
+
+print('archived rows:', archive.row_count())
+wanted = rows[500][1][0]
+print('lookup:', archive.find(wanted, id_timestamp(wanted)))
+print('range:', len(list(archive.iter_rows(start, start + 24 * 3600))))
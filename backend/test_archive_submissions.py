@@ -0,0 +1,81 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ['USE_EXCEL'] = 'true'
+
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+
+import server
+from archive import SubmissionArchive
+from validation import IdGenerator
+
+# Point every submission kind at a scratch workbook and archive, so the
+# shared files in data/ are never archived or rewritten.
+tmp = Path(tempfile.mkdtemp())
+for kind, path in list(server.SUBMISSION_FILES.items()):
+    scratch = tmp / path.name
+    server.EXCEL_HEADERS[scratch] = server.EXCEL_HEADERS[path]
+    server.TIMESTAMP_COLUMNS[scratch] = server.TIMESTAMP_COLUMNS[path]
+    wb = Workbook()
+    wb.active.append(server.EXCEL_HEADERS[scratch])
+    wb.save(scratch)
+    server.SUBMISSION_FILES[kind] = scratch
+    server.archives[kind] = SubmissionArchive(tmp / 'archive' / kind)
+server.STUDENTS_FILE = server.SUBMISSION_FILES['students']
+server.VOLUNTEERS_FILE = server.SUBMISSION_FILES['volunteers']
+server.CONTACTS_FILE = server.SUBMISSION_FILES['contacts']
+
+now = datetime.now(timezone.utc)
+
+
+def add_student(when, name):
+    row_id = IdGenerator(clock=when.timestamp).new_id()
+    server.add_to_excel(server.STUDENTS_FILE, [row_id, name, '13', 'Test School', 'parent@example.com', '1234567890', when.isoformat(), ''])
+    return row_id
+
+
+def all_ids():
+    return [row[0] for row in server.iter_submissions('students')]
+
+
+old_ids = [add_student(now - timedelta(days=400, minutes=i), f'Old {i}') for i in range(300)]
+for i in range(5):
+    add_student(now - timedelta(minutes=i), f'New {i}')
+
+print('first run:', server.archive_submissions(365))
+print('second run:', server.archive_submissions(365))
+print('hot rows:', server.get_row_count(server.STUDENTS_FILE), 'archived:', server.archives['students'].row_count())
+print('counts:', asyncio.run(server.get_registration_count()))
+
+# A run that wrote its segment but stopped before rewriting the workbook,
+# then a back-filled row older than everything already archived
+for i in range(50):
+    add_student(now - timedelta(days=380, minutes=i), f'Crash {i}')
+hot_old = [(server._row_timestamp(row, server.STUDENTS_FILE), row) for row in server._hot_rows('students') if row[1].startswith('Crash')]
+server.archives['students'].write_segment(server.EXCEL_HEADERS[server.STUDENTS_FILE], hot_old)
+add_student(now - timedelta(days=500), 'Backfilled')
+print('after crash, duplicated IDs:', len(all_ids()) - len(set(all_ids())))
+
+print('recovery run:', server.archive_submissions(365))
+ids = all_ids()
+print('after recovery: total', len(ids), 'unique', len(set(ids)), 'hot', server.get_row_count(server.STUDENTS_FILE),
+      'archived', server.archives['students'].row_count())
+print('counts:', asyncio.run(server.get_registration_count()))
+
+client = TestClient(server.app)
+token = client.post('/api/admin/login', json={'password': 'admin123'}).json()['token']
+auth = {'Authorization': f'Bearer {token}'}
+for path in ('/api/admin/submissions/students?q=backfilled',
+             '/api/admin/submissions/students/export',
+             f'/api/admin/submissions/students/{old_ids[150]}'):
+    without = client.get(path)
+    with_token = client.get(path, headers=auth)
+    print(path.split('?')[0], 'without token:', without.status_code, 'with token:', with_token.status_code)
+print('search:', [row[1] for row in client.get('/api/admin/submissions/students?q=backfilled', headers=auth).json()['rows']])
+print('export lines:', len(client.get('/api/admin/submissions/students/export', headers=auth).text.strip().splitlines()))
+print('lookup:', client.get(f'/api/admin/submissions/students/{old_ids[150]}', headers=auth).json()['row'][1])
+print('bad token:', client.get('/api/admin/submissions/students', headers={'Authorization': 'Bearer 1.abc'}).status_code)
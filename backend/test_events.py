@@ -0,0 +1,20 @@
+import asyncio
+from server import EventCreate, StudentRegistration, create_event, delete_event, list_events, register_student, get_event
+
+async def main():
+    event = await create_event(EventCreate(title='Regional Round', description='Test round', date='2030-05-01', location='Test Hall', student_cap=1))
+    print('created:', event)
+    try:
+        upcoming = await list_events('upcoming')
+        print('upcoming:', [e['id'] for e in upcoming])
+
+        student = StudentRegistration(name='Test Student', age='13', school='Test School', email='test@example.com', phone='1234567890', consent=True, event_id=event['id'])
+        res = await register_student(student)
+        print('register response:', res)
+        print('event after:', await get_event(event['id']))
+    finally:
+        # The event is full now; leaving it would make it the next upcoming
+        # event and reject registrations in the other test scripts
+        await delete_event(event['id'])
+
+asyncio.run(main())
@@ -0,0 +1,10 @@
+import asyncio
+import server
+
+async def main():
+    async with server.lifespan(server.app):
+        print('ready:', server.app.state.ready, server.app.state.data_file_errors)
+        print('counts:', await server.get_registration_count())
+    print('ready after shutdown:', server.app.state.ready)
+
+asyncio.run(main())
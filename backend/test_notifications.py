@@ -0,0 +1,51 @@
+import asyncio
+import socket
+import tempfile
+from pathlib import Path
+
+from aiosmtpd.controller import Controller
+
+from notifications import NotificationService, Outbox, SmtpSender
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.received = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.append(envelope)
+        return '250 OK'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def main():
+    handler = CollectingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    try:
+        outbox = Outbox(Path(tempfile.mkdtemp()) / 'outbox.jsonl')
+        service = NotificationService(outbox, lambda: SmtpSender('127.0.0.1', port), workers=2, batch_size=10)
+        await service.start()
+        for i in range(5):
+            service.enqueue(f'parent{i}@example.com', 'Registration confirmed', 'Hello', f'students:event:{i}')
+        print('duplicate queued:', service.enqueue('PARENT0@example.com', 'Registration confirmed', 'Hello', 'students:event:0'))
+        # A header with a newline can never be sent, so it should fail without retries
+        service.enqueue('parent9@example.com', 'Bad\nsubject', 'Hello', 'students:event:9')
+
+        for _ in range(50):
+            if outbox.pending_count() == 0:
+                break
+            await asyncio.sleep(0.1)
+        await service.stop(timeout=5)
+        print('received:', len(handler.received), 'pending:', outbox.pending_count())
+        print('malformed:', [(m['status'], m['attempts']) for m in outbox._messages.values() if m['to'] == 'parent9@example.com'])
+    finally:
+        controller.stop()
+
+asyncio.run(main())
@@ -0,0 +1,109 @@
+"""Field normalizers and ID generation shared by the submission endpoints.
+
+All patterns are compiled once at import time. Each normalizer returns the
+cleaned value or raises ``ValidationError`` with a message suitable for an
+HTTP 400 response.
+"""
+import random
+import re
+import threading
+import time
+
+MAX_PHONE_DIGITS = 10
+MAX_EMAIL_LENGTH = 254
+MIN_AGE = 4
+MAX_AGE = 19
+
+_NON_DIGITS = re.compile(r'\D')
+_AGE = re.compile(r'^\s*(\d{1,2})\s*(?:years?|yrs?)?\s*$', re.IGNORECASE)
+_EMAIL = re.compile(
+    r"^[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}$"
+)
+
+
+class ValidationError(ValueError):
+    pass
+
+
+def normalize_phone(value):
+    """Strip everything but digits and enforce at most MAX_PHONE_DIGITS."""
+    digits = _NON_DIGITS.sub('', value or '')
+    if len(digits) > MAX_PHONE_DIGITS:
+        raise ValidationError(f"Phone number must be at most {MAX_PHONE_DIGITS} digits")
+    return digits
+
+
+def normalize_email(value):
+    """Trim and lower-case the domain of an email address after checking its shape."""
+    email = (value or '').strip()
+    if len(email) > MAX_EMAIL_LENGTH or not _EMAIL.match(email):
+        raise ValidationError("Invalid email address")
+    local, domain = email.rsplit('@', 1)
+    return f"{local}@{domain.lower()}"
+
+
+def normalize_age(value):
+    """Accept '13', ' 13 ', '13 years' and return the age as a digit string."""
+    match = _AGE.match(value or '')
+    if not match or not MIN_AGE <= int(match.group(1)) <= MAX_AGE:
+        raise ValidationError(f"Age must be a number between {MIN_AGE} and {MAX_AGE}")
+    return str(int(match.group(1)))
+
+
+# Crockford base32: no I, L, O or U, so IDs are easy to read out over the phone.
+_ID_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_ID_DECODE = {char: index for index, char in enumerate(_ID_ALPHABET)}
+# Every 10-bit value as two characters, so an ID encodes with 8 lookups.
+# (base64.b32encode is a pure-Python loop and took most of new_id's time.)
+_ID_PAIRS = [high + low for high in _ID_ALPHABET for low in _ID_ALPHABET]
+_ID_LENGTH = 16  # 48-bit millisecond timestamp + 32-bit sequence = 80 bits
+_SEQUENCE_BITS = 32
+
+
+class IdGenerator:
+    """Time-sortable, monotonic 16-character IDs.
+
+    Within one process every ID is strictly greater than the previous one: IDs
+    issued in the same millisecond increment the sequence part, and sequence
+    overflow borrows the next millisecond. The sequence starts at a random
+    value each millisecond so IDs from separate worker processes are unlikely
+    to meet.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last = 0
+
+    def new_id(self):
+        with self._lock:
+            now_ms = int(self._clock() * 1000)
+            if now_ms > self._last >> _SEQUENCE_BITS:
+                # The random module is reseeded in forked children, so worker
+                # processes don't share sequences; os.urandom costs a syscall.
+                value = (now_ms << _SEQUENCE_BITS) | random.getrandbits(_SEQUENCE_BITS - 1)
+            else:
+                value = self._last + 1
+            self._last = value
+        pairs = _ID_PAIRS
+        return (pairs[value >> 70] + pairs[value >> 60 & 0x3FF] + pairs[value >> 50 & 0x3FF]
+                + pairs[value >> 40 & 0x3FF] + pairs[value >> 30 & 0x3FF] + pairs[value >> 20 & 0x3FF]
+                + pairs[value >> 10 & 0x3FF] + pairs[value & 0x3FF])
+
+
+def id_timestamp(compact_id):
+    """Return the creation time (epoch seconds) encoded in an ID, or None for other IDs."""
+    if not compact_id or len(compact_id) != _ID_LENGTH:
+        return None
+    value = 0
+    for char in compact_id:
+        digit = _ID_DECODE.get(char)
+        if digit is None:
+            return None
+        value = (value << 5) | digit
+    return (value >> _SEQUENCE_BITS) / 1000
+
+
+_generator = IdGenerator()
+new_id = _generator.new_id